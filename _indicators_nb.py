@@ -0,0 +1,166 @@
+"""
+Compiled kernels for the indicators in technical_analysis.
+
+numba and bottleneck come with the optional `fast` extra:
+
+    uv sync --extra fast
+    python _indicators_nb.py
+
+With numba installed the kernels are JIT-compiled on first use and release
+the GIL, so they can run concurrently on threads. The second command, which
+the devcontainer runs when it installs packages, compiles them ahead of time
+into the `_indicators_aot` extension next to this file; technical_analysis
+prefers it so the first call pays no JIT warmup.
+"""
+import os
+
+import numpy as np
+
+if __name__ == "__main__":
+    from numba.pycc import CC
+    cc = CC("_indicators_aot")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+else:
+    cc = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit so the kernels still run as plain Python.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+def _export(name, signature):
+    """
+    Register a kernel with the AOT compiler when this module is run as a build.
+    """
+    def decorator(func):
+        if cc is not None:
+            cc.export(name, signature)(func)
+        return func
+    return decorator
+
+@njit(cache=True, nogil=True)
+@_export("rsi_wilder", "f4[:](f4[:], i8)")
+def rsi_wilder(close, window):
+    """
+    Calculate RSI with Wilder's smoothing in one pass over the closes.
+    
+    Matches pandas ewm(alpha=1/window, adjust=False, min_periods=window + 1)
+    applied to the gains and losses; the first `window` values are NaN.
+    
+    Args:
+        close (numpy.ndarray): Close prices
+        window (int): Period for RSI calculation
+    
+    Returns:
+        numpy.ndarray: RSI values
+    """
+    n = len(close)
+    rsi = np.empty_like(close)
+    alpha = 1.0 / window
+    eps = np.finfo(np.float64).eps
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n):
+        delta = float(close[i]) - float(close[i - 1]) if i > 0 else 0.0
+        avg_gain += alpha * (max(delta, 0.0) - avg_gain)
+        avg_loss += alpha * (max(-delta, 0.0) - avg_loss)
+        if i < window:
+            rsi[i] = np.nan
+        else:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, eps))
+    
+    return rsi
+
+@njit(cache=True, nogil=True, fastmath=True)
+@_export("macd_fused", "UniTuple(f4[:], 3)(f4[:], f8, f8, f8)")
+def macd_fused(close, alpha_fast, alpha_slow, alpha_signal):
+    """
+    Run the fast, slow and signal EMAs of MACD in one pass over the closes.
+    
+    Matches pandas ewm(adjust=False): every EMA is seeded with its first input.
+    The EMAs accumulate in float64 and are stored in the dtype of `close`.
+    
+    Args:
+        close (numpy.ndarray): Close prices
+        alpha_fast (float): Smoothing factor of the fast EMA
+        alpha_slow (float): Smoothing factor of the slow EMA
+        alpha_signal (float): Smoothing factor of the signal EMA
+    
+    Returns:
+        tuple: (MACD line, Signal line, Histogram) as arrays
+    """
+    n = len(close)
+    macd_line = np.empty_like(close)
+    signal_line = np.empty_like(close)
+    histogram = np.empty_like(close)
+    
+    ema_fast = float(close[0])
+    ema_slow = float(close[0])
+    signal = 0.0
+    for i in range(n):
+        ema_fast += alpha_fast * (close[i] - ema_fast)
+        ema_slow += alpha_slow * (close[i] - ema_slow)
+        macd = ema_fast - ema_slow
+        signal += alpha_signal * (macd - signal)
+        macd_line[i] = macd
+        signal_line[i] = signal
+        histogram[i] = macd - signal
+    
+    return macd_line, signal_line, histogram
+
+@njit(cache=True, nogil=True)
+@_export("bbands", "UniTuple(f4[:], 3)(f4[:], i8, f8)")
+def bbands(close, window, num_std):
+    """
+    Calculate Bollinger Bands from a rolling mean and sample standard deviation.
+    
+    Every window is summed afresh in float64 rather than with running sums,
+    which would let rounding errors accumulate over long series.
+    
+    Args:
+        close (numpy.ndarray): Close prices
+        window (int): Window for moving average
+        num_std (float): Number of standard deviations
+    
+    Returns:
+        tuple: (Upper band, Middle band, Lower band) as arrays
+    """
+    n = len(close)
+    upper_band = np.empty_like(close)
+    middle_band = np.empty_like(close)
+    lower_band = np.empty_like(close)
+    
+    for i in range(n):
+        if i < window - 1:
+            upper_band[i] = np.nan
+            middle_band[i] = np.nan
+            lower_band[i] = np.nan
+            continue
+        
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += close[j]
+        mean = total / window
+        squares = 0.0
+        for j in range(i - window + 1, i + 1):
+            squares += (close[j] - mean) ** 2
+        std = np.sqrt(squares / (window - 1))
+        
+        upper_band[i] = mean + std * num_std
+        middle_band[i] = mean
+        lower_band[i] = mean - std * num_std
+    
+    return upper_band, middle_band, lower_band
+
+if __name__ == "__main__":
+    cc.compile()
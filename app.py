@@ -3,6 +3,9 @@ import pandas as pd
 import numpy as np
 import os
 import time
+import logging
+import string
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import app modules
@@ -11,6 +14,9 @@ from technical_analysis import calculate_all_indicators
 from signal_generator import SignalGenerator
 from chart_utils import create_price_chart, create_macd_chart
 
+# Debug output from the data modules is opt-in via LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
 # Set page configuration
 st.set_page_config(
     page_title="XAUUSD Trading Signal Agent",
@@ -43,37 +49,108 @@ macd_slow = st.sidebar.slider("MACD Slow Period", 20, 30, 26)
 macd_signal = st.sidebar.slider("MACD Signal Period", 5, 15, 9)
 bb_window = st.sidebar.slider("Bollinger Bands Window", 10, 30, 20)
 
+# Signal card markup, filled in once per rendered signal
+SIGNAL_TEMPLATE = string.Template("""
+<div style="padding: 20px; border-radius: 10px; background-color: $background">
+    <h3 style="color: $color; margin: 0;">Signal: $signal</h3>
+    <h4>Confidence: $confidence</h4>
+    <table>
+        <tr>
+            <td><strong>Entry Price:</strong></td>
+            <td>$$$entry_price</td>
+        </tr>
+        <tr>
+            <td><strong>Stop Loss:</strong></td>
+            <td>$$$stop_loss</td>
+        </tr>
+        <tr>
+            <td><strong>Take Profit:</strong></td>
+            <td>$$$take_profit</td>
+        </tr>
+    </table>
+    <h4>Rationale:</h4>
+    <p>$rationale</p>
+    <h4>Risk Factors:</h4>
+    <p>$risk_factors</p>
+</div>
+""")
+
+# (text color, background color) for each signal type
+SIGNAL_STYLES = {
+    "BUY": ("green", "rgba(0, 128, 0, 0.1)"),
+    "SELL": ("red", "rgba(255, 0, 0, 0.1)"),
+}
+DEFAULT_SIGNAL_STYLE = ("gray", "rgba(128, 128, 128, 0.1)")
+
 # Initialize session state
-if 'last_update' not in st.session_state:
-    st.session_state.last_update = None
-if 'market_data' not in st.session_state:
-    st.session_state.market_data = None
-if 'analysis_data' not in st.session_state:
-    st.session_state.analysis_data = None
-if 'signal_data' not in st.session_state:
-    st.session_state.signal_data = None
-if 'current_price' not in st.session_state:
-    st.session_state.current_price = None
-
-# Function to load data
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+SESSION_DEFAULTS = {
+    'last_update': None,
+    'market_data': None,
+    'analysis_data': None,
+    'signal_data': None,
+    'current_price': None,
+}
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+
+# Function to load data (market_data caches the downloads for 5 minutes)
 def load_market_data(period, interval):
     data = fetch_xauusd_data(period=period, interval=interval)
     if data.empty:
         st.error("Failed to fetch market data. Please try again later.")
     return data
 
+# Cheap identity for an indicator frame, used to key the chart caches
+def data_fingerprint(data):
+    return (len(data), data['date'].iloc[-1].value, float(data['close'].iloc[-1]))
+
+# Chart builders are only rerun when the fingerprint changes; the
+# underscore-prefixed arguments are excluded from Streamlit's hashing
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_price_chart(fingerprint, _analysis_data):
+    return create_price_chart(
+        _analysis_data['data'],
+        _analysis_data,
+        _analysis_data['support_levels'],
+        _analysis_data['resistance_levels']
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_macd_chart(fingerprint, _data):
+    return create_macd_chart(_data)
+
+# Sorted price levels as one markdown list, so each side is a single element
+@st.cache_data(max_entries=32, show_spinner=False)
+def format_levels(levels):
+    # Escape the dollar sign so Streamlit does not read it as LaTeX
+    return "\n".join(f"- \\${level:.2f}" for level in np.sort(np.asarray(levels)))
+
+# One generator per API key, kept across reruns so its OpenAI client and
+# connection pool are reused between signal requests
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_signal_generator(api_key):
+    return SignalGenerator(api_key=api_key)
+
 # Function to update data
 def update_data():
-    with st.spinner("Fetching market data..."):
-        st.session_state.market_data = load_market_data(period, interval)
+    # Intraday bars already end at the latest quote, so the extra 1m download
+    # is only needed for daily data; when it is, overlap it with the main fetch
+    intraday = interval.endswith(('m', 'h'))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        price_future = None if intraday else executor.submit(get_current_price)
         
-    if not st.session_state.market_data.empty:
-        with st.spinner("Calculating technical indicators..."):
-            st.session_state.analysis_data = calculate_all_indicators(st.session_state.market_data.copy())
+        with st.spinner("Fetching market data..."):
+            st.session_state.market_data = load_market_data(period, interval)
         
-        st.session_state.current_price = get_current_price()
-        st.session_state.last_update = datetime.now()
+        if not st.session_state.market_data.empty:
+            with st.spinner("Calculating technical indicators..."):
+                st.session_state.analysis_data = calculate_all_indicators(st.session_state.market_data)
+            
+            if intraday:
+                st.session_state.current_price = st.session_state.market_data['close'].iloc[-1]
+            else:
+                st.session_state.current_price = price_future.result()
+            st.session_state.last_update = datetime.now()
 
 # Button to manually update data
 if st.sidebar.button("Update Data"):
@@ -108,18 +185,14 @@ if st.session_state.market_data is not None and not st.session_state.market_data
     # Display price chart with indicators
     st.subheader("Price Chart with Technical Indicators")
     if st.session_state.analysis_data:
-        price_chart = create_price_chart(
-            st.session_state.analysis_data['data'],
-            st.session_state.analysis_data,
-            st.session_state.analysis_data['support_levels'],
-            st.session_state.analysis_data['resistance_levels']
-        )
+        chart_fingerprint = data_fingerprint(st.session_state.analysis_data['data'])
+        price_chart = cached_price_chart(chart_fingerprint, st.session_state.analysis_data)
         st.plotly_chart(price_chart, use_container_width=True)
     
     # Display MACD chart
     st.subheader("MACD (12,26,9)")
     if st.session_state.analysis_data:
-        macd_chart = create_macd_chart(st.session_state.analysis_data['data'])
+        macd_chart = cached_macd_chart(chart_fingerprint, st.session_state.analysis_data['data'])
         st.plotly_chart(macd_chart, use_container_width=True)
     
     # Support and Resistance levels
@@ -131,8 +204,7 @@ if st.session_state.market_data is not None and not st.session_state.market_data
             st.write("**Support Levels**")
             support_levels = st.session_state.analysis_data['support_levels']
             if len(support_levels) > 0:
-                for level in sorted(support_levels):
-                    st.write(f"${level:.2f}")
+                st.markdown(format_levels(tuple(support_levels)))
             else:
                 st.write("No significant support levels identified")
         
@@ -140,8 +212,7 @@ if st.session_state.market_data is not None and not st.session_state.market_data
             st.write("**Resistance Levels**")
             resistance_levels = st.session_state.analysis_data['resistance_levels']
             if len(resistance_levels) > 0:
-                for level in sorted(resistance_levels):
-                    st.write(f"${level:.2f}")
+                st.markdown(format_levels(tuple(resistance_levels)))
             else:
                 st.write("No significant resistance levels identified")
     
@@ -155,7 +226,7 @@ if st.session_state.market_data is not None and not st.session_state.market_data
                 st.error("Please enter your OpenAI API key in the sidebar to generate trading signals.")
             else:
                 # Generate trading signal with user-provided API key
-                signal_generator = SignalGenerator(api_key=api_key)
+                signal_generator = get_signal_generator(api_key)
                 st.session_state.signal_data = signal_generator.generate_trade_signal(
                     st.session_state.market_data,
                     st.session_state.analysis_data
@@ -169,33 +240,20 @@ if st.session_state.market_data is not None and not st.session_state.market_data
             st.error(signal_data["error"])
         else:
             # Create signal box with appropriate color
-            signal_color = "green" if signal_data["signal"] == "BUY" else "red" if signal_data["signal"] == "SELL" else "gray"
+            signal_color, signal_background = SIGNAL_STYLES.get(signal_data["signal"], DEFAULT_SIGNAL_STYLE)
             
             st.markdown(
-                f"""
-                <div style="padding: 20px; border-radius: 10px; background-color: {'rgba(0, 128, 0, 0.1)' if signal_color == 'green' else 'rgba(255, 0, 0, 0.1)' if signal_color == 'red' else 'rgba(128, 128, 128, 0.1)'}">
-                    <h3 style="color: {signal_color}; margin: 0;">Signal: {signal_data["signal"]}</h3>
-                    <h4>Confidence: {signal_data["confidence"]}</h4>
-                    <table>
-                        <tr>
-                            <td><strong>Entry Price:</strong></td>
-                            <td>${signal_data["entry_price"]:.2f}</td>
-                        </tr>
-                        <tr>
-                            <td><strong>Stop Loss:</strong></td>
-                            <td>${signal_data["stop_loss"]:.2f}</td>
-                        </tr>
-                        <tr>
-                            <td><strong>Take Profit:</strong></td>
-                            <td>${signal_data["take_profit"]:.2f}</td>
-                        </tr>
-                    </table>
-                    <h4>Rationale:</h4>
-                    <p>{signal_data["rationale"]}</p>
-                    <h4>Risk Factors:</h4>
-                    <p>{signal_data["risk_factors"]}</p>
-                </div>
-                """,
+                SIGNAL_TEMPLATE.substitute(
+                    color=signal_color,
+                    background=signal_background,
+                    signal=signal_data["signal"],
+                    confidence=signal_data["confidence"],
+                    entry_price=f"{signal_data['entry_price']:.2f}",
+                    stop_loss=f"{signal_data['stop_loss']:.2f}",
+                    take_profit=f"{signal_data['take_profit']:.2f}",
+                    rationale=signal_data["rationale"],
+                    risk_factors=signal_data["risk_factors"]
+                ),
                 unsafe_allow_html=True
             )
     
@@ -1,9 +1,78 @@
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
-def create_price_chart(data, indicators, support_levels=None, resistance_levels=None):
+def _level_lines(levels, x0, x1):
+    """
+    Build gap-separated coordinates drawing every level as a horizontal line.
+    
+    Args:
+        levels (array-like): Price levels
+        x0: Start of each line
+        x1: End of each line
+    
+    Returns:
+        tuple: (x values, y values) with a gap after each segment
+    """
+    xs = np.tile(np.array([x0, x1, None], dtype=object), len(levels))
+    ys = np.repeat(np.asarray(levels, dtype=np.float64), 3)
+    ys[2::3] = np.nan
+    return xs, ys
+
+# Upper bound on candles sent to the browser; longer histories are merged
+MAX_CHART_BARS = 2000
+
+# How consecutive bars are combined when a history is decimated
+CHART_AGGREGATION = {
+    'date': 'first',
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'bb_upper': 'last',
+    'bb_middle': 'last',
+    'bb_lower': 'last',
+    'rsi': 'last',
+}
+
+# RSI overbought/oversold reference lines on the lower panel; only the x
+# extent changes between charts
+RSI_LEVEL_SHAPES = (
+    {'type': 'line', 'y0': 70, 'y1': 70, 'xref': 'x2', 'yref': 'y2',
+     'line': {'color': 'red', 'width': 1, 'dash': 'dash'}},
+    {'type': 'line', 'y0': 30, 'y1': 30, 'xref': 'x2', 'yref': 'y2',
+     'line': {'color': 'green', 'width': 1, 'dash': 'dash'}},
+)
+
+def _decimate(data, max_bars):
+    """
+    Merge runs of consecutive bars into OHLC candles so at most max_bars remain.
+    
+    Bars are grouped by position rather than resampled by time, so market
+    closures do not produce empty candles.
+    
+    Args:
+        data (pandas.DataFrame): Price data with indicators
+        max_bars (int): Maximum number of bars to keep
+    
+    Returns:
+        pandas.DataFrame: The original data, or its decimated copy
+    """
+    if len(data) <= max_bars:
+        return data
+    step = -(-len(data) // max_bars)
+    groups = np.arange(len(data)) // step
+    return data.groupby(groups).agg(CHART_AGGREGATION).reset_index(drop=True)
+
+def _subplot_title(text, y):
+    """
+    Build a panel title annotation placed just above a panel's top edge.
+    """
+    return dict(text=text, x=0.5, y=y, xref='paper', yref='paper',
+                xanchor='center', yanchor='bottom', showarrow=False, font=dict(size=16))
+
+def create_price_chart(data, indicators, support_levels=None, resistance_levels=None,
+                       max_bars=MAX_CHART_BARS):
     """
     Create an interactive price chart with technical indicators.
     
@@ -12,6 +81,7 @@ def create_price_chart(data, indicators, support_levels=None, resistance_levels=
         indicators (dict): Technical indicators data
         support_levels (list): Support levels
         resistance_levels (list): Resistance levels
+        max_bars (int): Longer histories are merged down to this many candles
     
     Returns:
         plotly.graph_objects.Figure: Interactive chart
@@ -20,14 +90,11 @@ def create_price_chart(data, indicators, support_levels=None, resistance_levels=
         # Return empty figure if no data
         return go.Figure()
     
-    # Create subplots: 2 rows, 1 column, shared x-axis
-    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
-                        vertical_spacing=0.1,
-                        row_heights=[0.7, 0.3],
-                        subplot_titles=('XAUUSD Price with Indicators', 'RSI(14)'))
+    data = _decimate(data, max_bars)
+    x0, x1 = data['date'].iloc[0], data['date'].iloc[-1]
     
-    # Add candlestick chart to the first subplot
-    fig.add_trace(
+    # Collect every trace up front; the RSI trace lives on the second axis pair
+    traces = [
         go.Candlestick(
             x=data['date'],
             open=data['open'],
@@ -36,31 +103,19 @@ def create_price_chart(data, indicators, support_levels=None, resistance_levels=
             close=data['close'],
             name='XAUUSD Price'
         ),
-        row=1, col=1
-    )
-    
-    # Add Bollinger Bands
-    fig.add_trace(
+        # Bollinger Bands
         go.Scatter(
             x=data['date'],
             y=data['bb_upper'],
             line=dict(color='rgba(46, 49, 49, 0.7)', width=1, dash='dash'),
             name='BB Upper'
         ),
-        row=1, col=1
-    )
-    
-    fig.add_trace(
         go.Scatter(
             x=data['date'],
             y=data['bb_middle'],
             line=dict(color='rgba(46, 49, 49, 0.7)', width=1),
             name='BB Middle'
         ),
-        row=1, col=1
-    )
-    
-    fig.add_trace(
         go.Scatter(
             x=data['date'],
             y=data['bb_lower'],
@@ -69,80 +124,57 @@ def create_price_chart(data, indicators, support_levels=None, resistance_levels=
             fill='tonexty',
             fillcolor='rgba(231, 254, 255, 0.2)'
         ),
-        row=1, col=1
-    )
-    
-    # Add support and resistance levels if available
-    if support_levels is not None and len(support_levels) > 0:
-        for level in support_levels:
-            fig.add_shape(
-                type="line",
-                x0=data['date'].iloc[0],
-                x1=data['date'].iloc[-1],
-                y0=level,
-                y1=level,
-                line=dict(color="green", width=1, dash="dot"),
-                row=1, col=1
+    ]
+    
+    # Add support and resistance levels if available, one trace per side
+    for levels, color, name in ((support_levels, 'green', 'Support'),
+                                (resistance_levels, 'red', 'Resistance')):
+        if levels is not None and len(levels) > 0:
+            xs, ys = _level_lines(levels, x0, x1)
+            traces.append(
+                go.Scatter(
+                    x=xs,
+                    y=ys,
+                    mode='lines',
+                    line=dict(color=color, width=1, dash='dot'),
+                    name=name,
+                    hoverinfo='y'
+                )
             )
     
-    if resistance_levels is not None and len(resistance_levels) > 0:
-        for level in resistance_levels:
-            fig.add_shape(
-                type="line",
-                x0=data['date'].iloc[0],
-                x1=data['date'].iloc[-1],
-                y0=level,
-                y1=level,
-                line=dict(color="red", width=1, dash="dot"),
-                row=1, col=1
-            )
-    
-    # Add RSI indicator in the second subplot
-    fig.add_trace(
+    # RSI indicator in the lower panel
+    traces.append(
         go.Scatter(
             x=data['date'],
             y=data['rsi'],
             line=dict(color='purple', width=1),
-            name='RSI(14)'
-        ),
-        row=2, col=1
-    )
-    
-    # Add RSI overbought/oversold lines
-    fig.add_shape(
-        type="line",
-        x0=data['date'].iloc[0],
-        x1=data['date'].iloc[-1],
-        y0=70,
-        y1=70,
-        line=dict(color="red", width=1, dash="dash"),
-        row=2, col=1
+            name='RSI(14)',
+            xaxis='x2',
+            yaxis='y2'
+        )
     )
     
-    fig.add_shape(
-        type="line",
-        x0=data['date'].iloc[0],
-        x1=data['date'].iloc[-1],
-        y0=30,
-        y1=30,
-        line=dict(color="green", width=1, dash="dash"),
-        row=2, col=1
-    )
+    # RSI overbought/oversold lines
+    shapes = [{**template, 'x0': x0, 'x1': x1} for template in RSI_LEVEL_SHAPES]
     
-    # Update layout and axes
-    fig.update_layout(
+    # Two stacked panels (70% / 30% of the height after a 0.1 gap) sharing the x-axis
+    layout = go.Layout(
         title='XAUUSD Technical Analysis',
         height=800,
-        xaxis_rangeslider_visible=False,
-        yaxis_title='Price (USD)',
-        yaxis2_title='RSI Value',
+        xaxis=dict(anchor='y', domain=[0.0, 1.0], matches='x2', showticklabels=False,
+                   rangeslider=dict(visible=False)),
+        xaxis2=dict(anchor='y2', domain=[0.0, 1.0]),
+        yaxis=dict(anchor='x', domain=[0.37, 1.0], title='Price (USD)'),
+        yaxis2=dict(anchor='x2', domain=[0.0, 0.27], range=[0, 100], title='RSI Value'),
+        annotations=[
+            _subplot_title('XAUUSD Price with Indicators', 1.0),
+            _subplot_title('RSI(14)', 0.27),
+        ],
+        shapes=shapes,
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
-    # Set y-axis range for RSI
-    fig.update_yaxes(range=[0, 100], row=2, col=1)
-    
-    return fig
+    return go.Figure(data=traces, layout=layout)
 
 def create_macd_chart(data):
     """
@@ -179,13 +211,19 @@ def create_macd_chart(data):
         )
     )
     
-    # Add Histogram as bar chart
-    colors = ['green' if val >= 0 else 'red' for val in data['macd_histogram']]
+    # Add Histogram as bar chart, colored by sign through a two-tone colorscale
+    histogram = data['macd_histogram'].to_numpy()
+    color_limit = float(np.nanmax(np.abs(histogram), initial=0.0)) or 1.0
     fig.add_trace(
         go.Bar(
             x=data['date'],
-            y=data['macd_histogram'],
-            marker_color=colors,
+            y=histogram,
+            marker=dict(
+                color=histogram,
+                colorscale=[[0, 'red'], [0.5, 'red'], [0.5, 'green'], [1, 'green']],
+                cmin=-color_limit,
+                cmax=color_limit
+            ),
             name='Histogram'
         )
     )
@@ -1,138 +1,568 @@
 import os
 import json
-from openai import OpenAI
+import asyncio
+import time
+import logging
+import threading
+import numpy as np
+from typing import Literal
+from openai import OpenAI, AsyncOpenAI, OpenAIError
+from pydantic import BaseModel, ConfigDict
+from technical_analysis import calculate_latest_indicators
+
+logger = logging.getLogger(__name__)
+
+class TradeSignal(BaseModel):
+    """
+    Trading recommendation for a single market.
+    """
+    model_config = ConfigDict(extra='forbid')
+    
+    signal: Literal["BUY", "SELL", "NEUTRAL"]
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    confidence: Literal["LOW", "MEDIUM", "HIGH"]
+    rationale: str
+    risk_factors: str
+
+class BatchTradeSignal(TradeSignal):
+    """
+    Trading recommendation tagged with the symbol of the market it is for.
+    """
+    symbol: str
+
+class TradeSignalBatch(BaseModel):
+    """
+    One trading recommendation per market, in the order the markets were given.
+    """
+    model_config = ConfigDict(extra='forbid')
+    
+    signals: list[BatchTradeSignal]
+
+def _json_schema_format(model):
+    """
+    Build a strict structured-output response_format from a Pydantic model.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": True},
+    }
+
+TRADE_SIGNAL_FORMAT = _json_schema_format(TradeSignal)
+TRADE_SIGNAL_BATCH_FORMAT = _json_schema_format(TradeSignalBatch)
+
+# Transient API failures (429, 5xx, timeouts, dropped connections) are retried by the
+# client itself with jittered exponential backoff
+API_TIMEOUT = 15.0
+API_MAX_RETRIES = 5
+
+# Failures reported as an ERROR signal: API errors that outlived the retries and
+# unusable responses or market data
+SIGNAL_ERRORS = (OpenAIError, ValueError, KeyError, IndexError)
+
+# Markets combined into one request by generate_trade_signals_batch
+BATCH_SIZE = 4
+
+# Per-market section of the prompt, filled from a market summary with one %-substitution
+MARKET_CONDITIONS_TEMPLATE = """
+Current Market Conditions for %(label)s:
+- Current Price: $%(current_price).2f
+- 24h Price Change: $%(price_change_24h).2f (%(price_change_pct_24h).2f%%)
+- 24h High: $%(high_24h).2f
+- 24h Low: $%(low_24h).2f
+- 24h Volatility: $%(volatility_24h).2f
+
+Technical Indicators:
+- RSI (14): %(current_rsi).2f (%(rsi_trend)s)
+- MACD: %(current_macd).2f (Signal: %(current_macd_signal).2f, Trend: %(macd_trend)s)
+- Bollinger Bands: Price is near the %(bb_position)s (Upper: $%(current_bb_upper).2f, Lower: $%(current_bb_lower).2f)
+
+Support and Resistance Levels:
+- Support Levels: %(support_levels)s
+- Resistance Levels: %(resistance_levels)s
+"""
+
+# Indicator columns quoted in the prompt, in unpacking order
+INDICATOR_COLUMNS = ['rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_lower']
+
+class _JsonObjectTracker:
+    """
+    Follow the brace depth of a JSON object arriving in pieces.
+    
+    Braces inside string literals (including escaped quotes) are ignored, so
+    the end of the outermost object can be detected without parsing.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.parts = []
+    
+    @property
+    def content(self):
+        """
+        Text received so far, cut off after the outermost object.
+        """
+        return "".join(self.parts)
+    
+    def consume(self, chunk):
+        """
+        Take the next chunk of a streamed chat completion.
+        
+        Returns:
+            bool: True once the outermost object is complete
+        """
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            return False
+        text = chunk.choices[0].delta.content
+        end = self.feed(text)
+        self.parts.append(text if end is None else text[:end])
+        return end is not None
+    
+    def feed(self, text):
+        """
+        Consume the next piece of text.
+        
+        Returns:
+            int or None: Offset just past the closing brace of the outermost
+                object if it closes within `text`, otherwise None
+        """
+        for i, char in enumerate(text):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return None
 
 class SignalGenerator:
-    def __init__(self, api_key=None):
+    # Static instructions sent as the system message. Keeping them first and identical
+    # across calls lets OpenAI reuse the cached prompt prefix; the schema itself is
+    # enforced through response_format.
+    SIGNAL_SYSTEM_PROMPT = """
+You are an expert gold trading analyst specialized in XAUUSD technical analysis.
+Analyze the market data in the user message and generate a trading signal based only on the provided information.
+Provide a trading recommendation with a technically appropriate stop-loss and take-profit,
+your confidence level, a short trade rationale and the key risk factors to monitor.
+"""
+    BATCH_SYSTEM_PROMPT = """
+You are an expert trading analyst specialized in technical analysis.
+Analyze each of the markets in the user message independently and generate a trading signal for each one based only on the provided information.
+Provide one trading recommendation per market, in the order given and tagged with the market symbol exactly as given.
+Each needs a technically appropriate stop-loss and take-profit, your confidence level,
+a short trade rationale and the key risk factors to monitor.
+"""
+    
+    def __init__(self, api_key=None, compact_prompt=False):
         """
         Initialize the SignalGenerator with OpenAI API
         
         Args:
             api_key (str, optional): OpenAI API key provided by the user.
                 If not provided, attempt to get from environment variables.
+            compact_prompt (bool): Send each market as a compact JSON snapshot
+                instead of the prose summary, using roughly a third of the input tokens
         """
         # Get API key from parameter or environment variables
         if not api_key:
             api_key = os.getenv("OPENAI_API_KEY")
             
-        self.client = OpenAI(api_key=api_key)
+        # Callers that want the client's connection pool reused across requests keep
+        # the generator itself, e.g. app.py caches one per API key with a bounded cache
+        self.client = OpenAI(api_key=api_key, timeout=API_TIMEOUT, max_retries=API_MAX_RETRIES)
+        # Async client for callers fanning out several signals with asyncio.gather,
+        # created by _get_async_client for the event loop it runs on
+        self._api_key = api_key
+        self._aclient = None
+        self._aclient_loop = None
         # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
         # do not change this unless explicitly requested by the user
         self.model = "gpt-4o"
         
-    def generate_trade_signal(self, market_data, analysis_data):
+        # Signals keyed by a rounded market fingerprint, reused for cache_ttl seconds.
+        # app.py shares one generator across Streamlit sessions, so access is locked
+        self.cache_ttl = 300
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        
+        self.compact_prompt = compact_prompt
+        
+    def generate_trade_signal(self, market_data, analysis_data=None):
         """
         Generate trade signals based on technical analysis using OpenAI.
         
         Args:
             market_data (pandas.DataFrame): The market price data
-            analysis_data (dict): Dictionary containing technical indicators
+            analysis_data (dict, optional): Output of calculate_all_indicators or
+                calculate_latest_indicators; computed with the latter when omitted
         
         Returns:
             dict: Trade signal containing entry, stop-loss, take-profit and explanation
         """
         try:
-            if market_data.empty or not analysis_data:
-                return {
-                    "error": "Insufficient data to generate trade signal"
-                }
+            cache_key, signal_data, prompt = self._prepare(market_data, analysis_data)
+            if signal_data is not None:
+                return signal_data
             
-            # Extract the most recent data points for the prompt
-            recent_data = market_data.tail(24).copy()  # Last 24 hours
+            # Call the OpenAI API, stopping the stream once the JSON object closes
+            stream = self.client.chat.completions.create(**self._request_kwargs(prompt), stream=True)
             
-            # Prepare market data summary
-            market_summary = {
-                "current_price": analysis_data['last_price'],
-                "price_change_24h": recent_data['close'].iloc[-1] - recent_data['close'].iloc[0],
-                "price_change_pct_24h": ((recent_data['close'].iloc[-1] / recent_data['close'].iloc[0]) - 1) * 100,
-                "high_24h": recent_data['high'].max(),
-                "low_24h": recent_data['low'].min(),
-                "volatility_24h": recent_data['high'].max() - recent_data['low'].min(),
-                "current_rsi": analysis_data['data']['rsi'].iloc[-1],
-                "current_macd": analysis_data['data']['macd'].iloc[-1],
-                "current_macd_signal": analysis_data['data']['macd_signal'].iloc[-1],
-                "current_bb_upper": analysis_data['data']['bb_upper'].iloc[-1],
-                "current_bb_lower": analysis_data['data']['bb_lower'].iloc[-1],
-                "support_levels": list(analysis_data['support_levels']),
-                "resistance_levels": list(analysis_data['resistance_levels']),
-            }
+            signal_data = self._parse_content(self._read_streamed_json(stream))
+            self._store_signal(cache_key, signal_data)
+            return signal_data
             
-            # Format technical indicator trends
-            rsi_trend = "overbought" if market_summary["current_rsi"] > 70 else "oversold" if market_summary["current_rsi"] < 30 else "neutral"
-            macd_trend = "bullish" if market_summary["current_macd"] > market_summary["current_macd_signal"] else "bearish"
-            bb_position = "upper_band" if analysis_data['last_price'] > market_summary["current_bb_upper"] else \
-                          "lower_band" if analysis_data['last_price'] < market_summary["current_bb_lower"] else "middle"
+        except SIGNAL_ERRORS as e:
+            return self._error_signal(e)
+    
+    def generate_trade_signals_batch(self, markets, batch_size=BATCH_SIZE):
+        """
+        Generate trade signals for several markets with one API call per batch.
+        
+        Up to `batch_size` market summaries share a single prompt and the model
+        returns a JSON array of signals. Markets whose signal is still cached
+        are not sent, and if a batch response cannot be matched back to its
+        markets those markets fall back to individual calls.
+        
+        Args:
+            markets (dict): Maps each symbol to a (market_data, analysis_data) pair;
+                analysis_data may be None to compute only the latest indicators
+            batch_size (int): Maximum number of markets per request
+        
+        Returns:
+            dict: Trade signal for each symbol
+        """
+        signals = {}
+        pending = []
+        for symbol, (market_data, analysis_data) in markets.items():
+            try:
+                if analysis_data is None:
+                    analysis_data = calculate_latest_indicators(market_data)
+                if market_data.empty or not analysis_data:
+                    signals[symbol] = {"error": "Insufficient data to generate trade signal"}
+                    continue
+                market_summary = self._summarize(market_data, analysis_data)
+            except SIGNAL_ERRORS as e:
+                signals[symbol] = self._error_signal(e)
+                continue
+            cache_key = self._cache_key(market_summary)
+            cached_signal = self._cached_signal(cache_key)
+            if cached_signal is not None:
+                signals[symbol] = cached_signal
+            else:
+                pending.append((symbol, market_summary, cache_key))
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                prompt = self._build_batch_prompt([(symbol, summary) for symbol, summary, _ in batch])
+                request = self._request_kwargs(prompt, TRADE_SIGNAL_BATCH_FORMAT, self.BATCH_SYSTEM_PROMPT)
+                request["max_tokens"] *= len(batch)
+                response = self.client.chat.completions.create(**request)
+                batch_signals = {item.pop("symbol"): item
+                                 for item in self._parse_response(response, TradeSignalBatch)["signals"]}
+            except SIGNAL_ERRORS as e:
+                logger.warning("Batch signal generation failed, retrying individually: %s", e)
+                batch_signals = {}
             
-            # Prepare the market data part of the prompt
-            market_data_prompt = f"""
-You are an expert gold trading analyst specialized in XAUUSD technical analysis.
-Analyze the following market data and generate a trading signal based only on the provided information.
-
-Current Market Conditions for XAUUSD (Gold/USD):
-- Current Price: ${market_summary['current_price']:.2f}
-- 24h Price Change: ${market_summary['price_change_24h']:.2f} ({market_summary['price_change_pct_24h']:.2f}%)
-- 24h High: ${market_summary['high_24h']:.2f}
-- 24h Low: ${market_summary['low_24h']:.2f}
-- 24h Volatility: ${market_summary['volatility_24h']:.2f}
-
-Technical Indicators:
-- RSI (14): {market_summary['current_rsi']:.2f} ({rsi_trend})
-- MACD: {market_summary['current_macd']:.2f} (Signal: {market_summary['current_macd_signal']:.2f}, Trend: {macd_trend})
-- Bollinger Bands: Price is near the {bb_position} (Upper: ${market_summary['current_bb_upper']:.2f}, Lower: ${market_summary['current_bb_lower']:.2f})
-
-Support and Resistance Levels:
-- Support Levels: {[f"${level:.2f}" for level in market_summary['support_levels']]}
-- Resistance Levels: {[f"${level:.2f}" for level in market_summary['resistance_levels']]}
-"""
-
-            # Schema part as a plain string, not f-string
-            schema_prompt = """
-Based on this technical analysis, provide a trading recommendation in JSON format:
-1. Signal type (BUY, SELL, or NEUTRAL)
-2. Entry price
-3. Stop-loss price (specify a technically appropriate level)
-4. Take-profit price (specify a technically appropriate level)
-5. Confidence level (LOW, MEDIUM, HIGH)
-6. Short explanation of the trade rationale
-7. Key risk factors to monitor
-
-Response must be in a single valid JSON object with these exact keys:
-{
-  "signal": "BUY, SELL, or NEUTRAL",  
-  "entry_price": 0.0,
-  "stop_loss": 0.0,
-  "take_profit": 0.0,
-  "confidence": "LOW, MEDIUM, or HIGH",
-  "rationale": "explanation here",
-  "risk_factors": "risks here"
-}
-"""
-            # Combine the parts
-            prompt = market_data_prompt + schema_prompt
-
-            # Call the OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=1000
-            )
+            for symbol, _, cache_key in batch:
+                if symbol in batch_signals:
+                    signals[symbol] = batch_signals[symbol]
+                    self._store_signal(cache_key, batch_signals[symbol])
+                else:
+                    signals[symbol] = self.generate_trade_signal(*markets[symbol])
+        
+        return signals
+    
+    async def agenerate_trade_signal(self, market_data, analysis_data=None):
+        """
+        Async variant of generate_trade_signal using the AsyncOpenAI client.
+        
+        Lets callers generate signals for several symbols or timeframes
+        concurrently, e.g. with asyncio.gather.
+        
+        Args:
+            market_data (pandas.DataFrame): The market price data
+            analysis_data (dict, optional): Output of calculate_all_indicators or
+                calculate_latest_indicators; computed with the latter when omitted
+        
+        Returns:
+            dict: Trade signal containing entry, stop-loss, take-profit and explanation
+        """
+        try:
+            cache_key, signal_data, prompt = self._prepare(market_data, analysis_data)
+            if signal_data is not None:
+                return signal_data
             
-            # Parse the response
-            response_content = response.choices[0].message.content
-            signal_data = json.loads(response_content)
+            # Call the OpenAI API, stopping the stream once the JSON object closes
+            stream = await self._get_async_client().chat.completions.create(**self._request_kwargs(prompt), stream=True)
             
+            signal_data = self._parse_content(await self._aread_streamed_json(stream))
+            self._store_signal(cache_key, signal_data)
             return signal_data
             
-        except Exception as e:
-            print(f"Error generating trade signal: {e}")
-            return {
-                "signal": "ERROR",
-                "entry_price": 0.0,
-                "stop_loss": 0.0,
-                "take_profit": 0.0,
-                "confidence": "LOW",
-                "rationale": f"Failed to generate trade signal: {str(e)}",
-                "risk_factors": "Unable to assess risks due to signal generation failure"
-            }
+        except SIGNAL_ERRORS as e:
+            return self._error_signal(e)
+    
+    def _prepare(self, market_data, analysis_data):
+        """
+        Shared prelude of generate_trade_signal and agenerate_trade_signal.
+        
+        Args:
+            market_data (pandas.DataFrame): The market price data
+            analysis_data (dict or None): Technical indicators, computed when None
+        
+        Returns:
+            tuple: (cache key, ready signal, prompt). The ready signal is an error
+                or a cached signal that needs no request; otherwise it is None
+                and the prompt is set.
+        """
+        if analysis_data is None:
+            analysis_data = calculate_latest_indicators(market_data)
+        if market_data.empty or not analysis_data:
+            return None, {"error": "Insufficient data to generate trade signal"}, None
+        
+        market_summary = self._summarize(market_data, analysis_data)
+        
+        # Reuse the last signal while the market picture is unchanged
+        cache_key = self._cache_key(market_summary)
+        cached_signal = self._cached_signal(cache_key)
+        if cached_signal is not None:
+            return cache_key, cached_signal, None
+        
+        return cache_key, None, self._build_prompt(market_summary)
+    
+    def _get_async_client(self):
+        """
+        Return the AsyncOpenAI client for the running event loop.
+        
+        An async client's connections are bound to the loop that opened them,
+        so a new client is created whenever this generator is used from another
+        loop, e.g. by separate asyncio.run calls on a cached generator.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            self._aclient = AsyncOpenAI(api_key=self._api_key, timeout=API_TIMEOUT, max_retries=API_MAX_RETRIES)
+            self._aclient_loop = loop
+        return self._aclient
+    
+    def _summarize(self, market_data, analysis_data):
+        """
+        Collect the latest market figures and indicator readings for the prompt.
+        
+        Args:
+            market_data (pandas.DataFrame): The market price data
+            analysis_data (dict): Output of calculate_all_indicators or calculate_latest_indicators
+        
+        Returns:
+            dict: Market summary, including the derived indicator trends
+        """
+        # Extract the most recent data points for the prompt
+        recent = market_data[['high', 'low', 'close']].tail(24).to_numpy(dtype=np.float64)  # Last 24 hours
+        first_close, last_close = recent[0, 2], recent[-1, 2]
+        high_24h, low_24h = recent[:, 0].max(), recent[:, 1].min()
+        
+        if 'data' in analysis_data:
+            # Read every indicator from the last row in a single lookup
+            latest = analysis_data['data'][INDICATOR_COLUMNS].iloc[-1].to_numpy(dtype=np.float64)
+        else:
+            # calculate_latest_indicators already returns the latest values
+            latest = [analysis_data[column] for column in INDICATOR_COLUMNS]
+        rsi, macd, macd_signal, bb_upper, bb_lower = latest
+        
+        # Prepare market data summary
+        market_summary = {
+            "current_price": analysis_data['last_price'],
+            "price_change_24h": last_close - first_close,
+            "price_change_pct_24h": ((last_close / first_close) - 1) * 100,
+            "high_24h": high_24h,
+            "low_24h": low_24h,
+            "volatility_24h": high_24h - low_24h,
+            "current_rsi": rsi,
+            "current_macd": macd,
+            "current_macd_signal": macd_signal,
+            "current_bb_upper": bb_upper,
+            "current_bb_lower": bb_lower,
+            "support_levels": list(analysis_data['support_levels']),
+            "resistance_levels": list(analysis_data['resistance_levels']),
+        }
+        
+        # Format technical indicator trends
+        rsi_trend = "overbought" if market_summary["current_rsi"] > 70 else "oversold" if market_summary["current_rsi"] < 30 else "neutral"
+        macd_trend = "bullish" if market_summary["current_macd"] > market_summary["current_macd_signal"] else "bearish"
+        bb_position = "upper_band" if analysis_data['last_price'] > market_summary["current_bb_upper"] else \
+                      "lower_band" if analysis_data['last_price'] < market_summary["current_bb_lower"] else "middle"
+        market_summary.update(rsi_trend=rsi_trend, macd_trend=macd_trend, bb_position=bb_position)
+        
+        return market_summary
+    
+    def _market_conditions(self, market_summary, label):
+        """
+        Describe one market's prices, indicators and levels for the prompt.
+        
+        Args:
+            market_summary (dict): Output of _summarize
+            label (str): Name of the market used in the section heading
+        
+        Returns:
+            str: Market conditions section of the prompt
+        """
+        if self.compact_prompt:
+            # Two decimals carry all the precision the prose version shows
+            snapshot = {key: value if isinstance(value, str) else
+                             [round(float(level), 2) for level in value] if isinstance(value, list) else
+                             round(float(value), 2)
+                        for key, value in market_summary.items()}
+            return f"MARKET_SNAPSHOT {label}: {json.dumps(snapshot, separators=(',', ':'))}\n"
+        
+        return MARKET_CONDITIONS_TEMPLATE % dict(
+            market_summary,
+            label=label,
+            support_levels=", ".join(f"${level:.2f}" for level in market_summary['support_levels']),
+            resistance_levels=", ".join(f"${level:.2f}" for level in market_summary['resistance_levels']),
+        )
+    
+    def _build_prompt(self, market_summary):
+        """
+        Build the analysis prompt from a market summary.
+        
+        Args:
+            market_summary (dict): Output of _summarize
+        
+        Returns:
+            str: User message for the chat completion, sent after SIGNAL_SYSTEM_PROMPT
+        """
+        return self._market_conditions(market_summary, "XAUUSD (Gold/USD)")
+    
+    def _build_batch_prompt(self, summaries):
+        """
+        Build one prompt asking for a signal for each of several markets.
+        
+        Args:
+            summaries (list): (symbol, market summary) pairs
+        
+        Returns:
+            str: User message for the chat completion, sent after BATCH_SYSTEM_PROMPT
+        """
+        return "".join(f"\n### Market {i}: {symbol}\n" + self._market_conditions(summary, symbol)
+                       for i, (symbol, summary) in enumerate(summaries, start=1))
+    
+    def _cache_key(self, market_summary):
+        """
+        Fingerprint of the inputs that materially change the model's answer.
+        
+        Values are rounded so tiny moves map to the same key.
+        """
+        return (
+            round(float(market_summary["current_price"]), 2),
+            round(float(market_summary["current_rsi"]), 1),
+            round(float(market_summary["current_macd"] - market_summary["current_macd_signal"]), 3),
+            market_summary["bb_position"],
+            tuple(round(float(level), 2) for level in market_summary["support_levels"]),
+            tuple(round(float(level), 2) for level in market_summary["resistance_levels"]),
+        )
+    
+    def _cached_signal(self, cache_key):
+        """
+        Return a copy of a cached signal younger than cache_ttl, or None.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                return None
+            stored_at, signal_data = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                self._cache.pop(cache_key, None)
+                return None
+            return dict(signal_data)
+    
+    def _store_signal(self, cache_key, signal_data):
+        """
+        Remember a signal and drop entries that have expired.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            self._cache = {key: entry for key, entry in self._cache.items()
+                           if now - entry[0] <= self.cache_ttl}
+            self._cache[cache_key] = (now, dict(signal_data))
+    
+    def _request_kwargs(self, prompt, response_format=TRADE_SIGNAL_FORMAT, system_prompt=None):
+        """
+        Arguments for chat.completions.create, shared by the sync and async paths.
+        """
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt or self.SIGNAL_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            response_format=response_format,
+            temperature=0.1,
+            max_tokens=400
+        )
+    
+    def _read_streamed_json(self, stream):
+        """
+        Collect streamed content until the top-level JSON object is complete.
+        
+        Breaking out early and closing the stream abandons the rest of the
+        generation instead of waiting for the model to finish.
+        """
+        tracker = _JsonObjectTracker()
+        try:
+            for chunk in stream:
+                if tracker.consume(chunk):
+                    break
+        finally:
+            stream.close()
+        return tracker.content
+    
+    async def _aread_streamed_json(self, stream):
+        """
+        Async counterpart of _read_streamed_json.
+        """
+        tracker = _JsonObjectTracker()
+        try:
+            async for chunk in stream:
+                if tracker.consume(chunk):
+                    break
+        finally:
+            await stream.close()
+        return tracker.content
+    
+    def _parse_content(self, content, model=TradeSignal):
+        """
+        Validate the model's JSON reply against its schema and return it as a dict.
+        """
+        return model.model_validate_json(content).model_dump()
+    
+    def _parse_response(self, response, model=TradeSignal):
+        """
+        Validate the reply of a non-streamed chat completion.
+        """
+        return self._parse_content(response.choices[0].message.content, model)
+    
+    def _error_signal(self, error):
+        """
+        Signal returned in place of a real one when generation fails.
+        """
+        logger.exception("Error generating trade signal: %s", error)
+        return {
+            "signal": "ERROR",
+            "entry_price": 0.0,
+            "stop_loss": 0.0,
+            "take_profit": 0.0,
+            "confidence": "LOW",
+            "rationale": f"Failed to generate trade signal: {str(error)}",
+            "risk_factors": "Unable to assess risks due to signal generation failure"
+        }
@@ -1,10 +1,51 @@
+import threading
 import pandas as pd
 import numpy as np
-from scipy.signal import find_peaks
+from concurrent.futures import ThreadPoolExecutor
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# Indicator math runs in float32: ~7 significant digits are plenty for gold prices
+# and halve the memory traffic of every pass
+PRICE_DTYPE = np.float32
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Recent calculate_all_indicators results, keyed by _indicator_cache_key. Streamlit
+# runs each session's script on its own thread, so access goes through the lock
+INDICATOR_CACHE_SIZE = 32
+_INDICATOR_CACHE = {}
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+# Columns calculate_all_indicators appends to the price frame
+INDICATOR_COLUMNS = ['rsi', 'macd', 'macd_signal', 'macd_histogram', 'bb_upper', 'bb_middle', 'bb_lower']
+
+# Bars used by calculate_latest_indicators. The slowest recurrence is RSI's Wilder
+# average (alpha 1/14, below MACD's slow EMA at 2/27); it keeps (13/14)**500 ~ 8e-17
+# of its seed after 500 bars, so the latest values match a full-history computation
+LATEST_TAIL = 500
+
+# Frames at least this long compute their indicators concurrently on a shared pool;
+# the kernels release the GIL, but for short frames the hand-off costs more than it saves
+PARALLEL_MIN_ROWS = 100000
+_INDICATOR_POOL = None
+_INDICATOR_POOL_LOCK = threading.Lock()
+
+# Compiled indicator kernels: the AOT extension built by `python _indicators_nb.py`
+# if present, else the numba JIT versions; without either, numpy/pandas are used
+try:
+    import _indicators_aot as _kernels
+    KERNELS_AVAILABLE = True
+except ImportError:
+    import _indicators_nb as _kernels
+    KERNELS_AVAILABLE = _kernels.NUMBA_AVAILABLE
 
 def calculate_rsi(data, window=14):
     """
-    Calculate the Relative Strength Index (RSI).
+    Calculate the Relative Strength Index (RSI) with Wilder's smoothing.
     
     Args:
         data (pandas.DataFrame): DataFrame with price data
@@ -13,23 +54,30 @@ def calculate_rsi(data, window=14):
     Returns:
         pandas.Series: RSI values
     """
-    delta = data['close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
+    close = data['close'].to_numpy(dtype=PRICE_DTYPE)
+    if KERNELS_AVAILABLE:
+        return pd.Series(_kernels.rsi_wilder(close, window), index=data.index)
     
-    avg_gain = gain.rolling(window=window).mean()
-    avg_loss = loss.rolling(window=window).mean()
+    delta = np.diff(close, prepend=close[:1])
+    gain = np.maximum(delta, 0)
+    loss = np.maximum(-delta, 0)
+    
+    # Wilder's moving average is an EMA with alpha = 1 / window
+    avg_gain = pd.Series(gain).ewm(alpha=1 / window, adjust=False, min_periods=window + 1).mean().to_numpy()
+    avg_loss = pd.Series(loss).ewm(alpha=1 / window, adjust=False, min_periods=window + 1).mean().to_numpy()
     
     # Handle division by zero
-    rs = avg_gain / avg_loss.replace(0, np.finfo(float).eps)
-    rsi = 100 - (100 / (1 + rs))
+    rsi = 100 - 100 / (1 + avg_gain / np.maximum(avg_loss, np.finfo(float).eps))
     
-    return rsi
+    return pd.Series(rsi.astype(PRICE_DTYPE), index=data.index)
 
 def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     """
     Calculate Moving Average Convergence Divergence (MACD).
     
+    With compiled kernels available the three EMAs run fused in one pass;
+    otherwise pandas computes them one after another.
+    
     Args:
         data (pandas.DataFrame): DataFrame with price data
         fast_period (int): Fast EMA period
@@ -39,6 +87,15 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     Returns:
         tuple: (MACD line, Signal line, Histogram)
     """
+    if KERNELS_AVAILABLE and not data.empty:
+        close = data['close'].to_numpy(dtype=PRICE_DTYPE)
+        macd_line, signal_line, histogram = _kernels.macd_fused(
+            close, 2 / (fast_period + 1), 2 / (slow_period + 1), 2 / (signal_period + 1)
+        )
+        return (pd.Series(macd_line, index=data.index),
+                pd.Series(signal_line, index=data.index),
+                pd.Series(histogram, index=data.index))
+    
     ema_fast = data['close'].ewm(span=fast_period, adjust=False).mean()
     ema_slow = data['close'].ewm(span=slow_period, adjust=False).mean()
     
@@ -46,12 +103,14 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
     histogram = macd_line - signal_line
     
-    return macd_line, signal_line, histogram
+    return macd_line.astype(PRICE_DTYPE), signal_line.astype(PRICE_DTYPE), histogram.astype(PRICE_DTYPE)
 
 def calculate_bollinger_bands(data, window=20, num_std=2):
     """
     Calculate Bollinger Bands.
     
+    Uses the compiled kernel when available, then bottleneck, then pandas.
+    
     Args:
         data (pandas.DataFrame): DataFrame with price data
         window (int): Window for moving average
@@ -60,79 +119,217 @@ def calculate_bollinger_bands(data, window=20, num_std=2):
     Returns:
         tuple: (Upper band, Middle band, Lower band)
     """
-    middle_band = data['close'].rolling(window=window).mean()
-    std_dev = data['close'].rolling(window=window).std()
+    if KERNELS_AVAILABLE:
+        close = data['close'].to_numpy(dtype=PRICE_DTYPE)
+        upper_band, middle_band, lower_band = _kernels.bbands(close, window, float(num_std))
+        return (pd.Series(upper_band, index=data.index),
+                pd.Series(middle_band, index=data.index),
+                pd.Series(lower_band, index=data.index))
+    
+    if bn is not None and len(data) >= window:
+        # Bottleneck computes both moving statistics in single C passes. Its running
+        # sums accumulate in the input dtype, which drifts badly for the std in float32
+        close = data['close'].to_numpy(dtype=np.float64)
+        middle_band = pd.Series(bn.move_mean(close, window, min_count=window).astype(PRICE_DTYPE), index=data.index)
+        std_dev = pd.Series(bn.move_std(close, window, min_count=window, ddof=1).astype(PRICE_DTYPE), index=data.index)
+    else:
+        middle_band = data['close'].rolling(window=window).mean().astype(PRICE_DTYPE)
+        std_dev = data['close'].rolling(window=window).std().astype(PRICE_DTYPE)
     
     upper_band = middle_band + (std_dev * num_std)
     lower_band = middle_band - (std_dev * num_std)
     
     return upper_band, middle_band, lower_band
 
-def find_support_resistance(data, window=10, prominence=0.5):
+def _find_swing_levels(high, low, window, tol):
     """
-    Find support and resistance levels based on local minima and maxima.
+    Find swing highs and swing lows with moving-window extrema.
+    
+    A bar is a swing high when its high is the highest high within `window`
+    bars on either side and stands at least `tol` above the lowest low of
+    that window; swing lows are defined symmetrically. Only bars with a full
+    `window` on both sides qualify, so the first and the latest bars are never
+    reported before later bars have confirmed them.
     
     Args:
-        data (pandas.DataFrame): DataFrame with price data
-        window (int): Window for peaks detection
-        prominence (float): Prominence factor for peak detection
+        high (numpy.ndarray): High prices
+        low (numpy.ndarray): Low prices
+        window (int): Number of bars on each side to compare against
+        tol (float): Minimum distance to the opposite extreme of the window
     
     Returns:
-        tuple: (Support levels, Resistance levels)
+        tuple: (Swing low prices, Swing high prices) in chronological order
+    """
+    size = 2 * window + 1
+    window_high = maximum_filter1d(high, size, mode='nearest')
+    window_low = minimum_filter1d(low, size, mode='nearest')
+    
+    # Edge bars see a clipped window, so they cannot be confirmed as swing points
+    idx = np.arange(len(high))
+    valid = (idx >= window) & (idx < len(high) - window)
+    
+    resistance = high[valid & (high >= window_high) & (high - window_low >= tol)]
+    support = low[valid & (low <= window_low) & (window_high - low >= tol)]
+    
+    return support, resistance
+
+def _dedupe_levels(levels, tolerance=0.001):
     """
-    # Identify peaks and troughs in the price data
-    prices = data['close'].values
+    Sort price levels and drop any within `tolerance` (relative) of its neighbour.
     
-    # Find peaks for resistance levels
-    resistance_idx, _ = find_peaks(prices, distance=window, prominence=prominence)
-    resistance_levels = prices[resistance_idx]
+    Args:
+        levels (numpy.ndarray): Candidate price levels
+        tolerance (float): Relative distance below which levels are merged
     
-    # Find troughs for support levels
-    support_idx, _ = find_peaks(-prices, distance=window, prominence=prominence)
-    support_levels = prices[support_idx]
+    Returns:
+        numpy.ndarray: Sorted, de-duplicated levels
+    """
+    levels = np.sort(levels)
+    if len(levels) == 0:
+        return levels
+    keep = np.empty(len(levels), dtype=bool)
+    keep[0] = True
+    keep[1:] = np.abs(np.diff(levels)) / levels[1:] > tolerance
+    return levels[keep]
+
+def find_support_resistance(data, window=10, prominence=0.5):
+    """
+    Find support and resistance levels based on swing lows and swing highs.
     
-    # Focus on only the most recent levels (last 3-5)
-    support_levels = np.array(sorted(support_levels))[-5:] if len(support_levels) > 0 else []
-    resistance_levels = np.array(sorted(resistance_levels))[-5:] if len(resistance_levels) > 0 else []
+    Args:
+        data (pandas.DataFrame): DataFrame with price data
+        window (int): Number of bars on each side a swing point must dominate
+        prominence (float): Minimum price range around a swing point
     
-    # Remove duplicate or very close levels (within 0.1% of each other)
-    if len(support_levels) > 0:
-        support_levels = np.array([support_levels[0]] + [s for i, s in enumerate(support_levels[1:]) 
-                                  if abs(s - support_levels[i]) / s > 0.001])
+    Returns:
+        tuple: (Support levels, Resistance levels)
+    """
+    # Compare each bar against the extremes of its surrounding window
+    high = data['high'].to_numpy(dtype=PRICE_DTYPE)
+    low = data['low'].to_numpy(dtype=PRICE_DTYPE)
+    support_levels, resistance_levels = _find_swing_levels(high, low, window, prominence)
     
-    if len(resistance_levels) > 0:
-        resistance_levels = np.array([resistance_levels[0]] + [r for i, r in enumerate(resistance_levels[1:]) 
-                                     if abs(r - resistance_levels[i]) / r > 0.001])
+    # Remove duplicate or very close levels, then keep the top five
+    support_levels = _dedupe_levels(support_levels)[-5:]
+    resistance_levels = _dedupe_levels(resistance_levels)[-5:]
     
     return support_levels, resistance_levels
 
+def _indicator_cache_key(data):
+    """
+    Identify a price frame by its length, last timestamp and last close.
+    """
+    last_time = data['date'].iloc[-1] if 'date' in data.columns else data.index[-1]
+    return (len(data), last_time, float(data['close'].iloc[-1]))
+
 def calculate_all_indicators(data):
     """
     Calculate all technical indicators.
     
+    Indicator columns are appended to `data` in place and price columns that
+    are not float32 yet are converted in place; nothing else is modified, so
+    callers do not need to pass a defensive copy. Results for the last
+    INDICATOR_CACHE_SIZE frames are cached, and a frame with the same
+    length, last timestamp and last close gets the cached indicator columns
+    copied onto it instead of recomputing them, so hits and misses both
+    return the caller's own frame as 'data'.
+    
     Args:
         data (pandas.DataFrame): DataFrame with price data
     
     Returns:
         dict: Dictionary containing all calculated indicators
     """
+    # market_data already delivers float32 prices; only cast frames from elsewhere
+    to_cast = {column: PRICE_DTYPE for column in PRICE_COLUMNS
+               if column in data.columns and data[column].dtype != PRICE_DTYPE}
+    if to_cast:
+        data[list(to_cast)] = data.astype(to_cast)[list(to_cast)]
+    
+    if data.empty:
+        return _compute_all_indicators(data)
+    
+    key = _indicator_cache_key(data)
+    with _INDICATOR_CACHE_LOCK:
+        cached = _INDICATOR_CACHE.get(key)
+    
+    if cached is not None:
+        # Positional assignment: the cached frame may carry a different index
+        data[INDICATOR_COLUMNS] = cached['indicators']
+        return {
+            'data': data,
+            'support_levels': cached['support_levels'],
+            'resistance_levels': cached['resistance_levels'],
+            'last_price': cached['last_price']
+        }
+    
+    result = _compute_all_indicators(data)
+    # Keep a private copy of the indicator values so no session's frame is shared
+    cached = {
+        'indicators': data[INDICATOR_COLUMNS].to_numpy(copy=True),
+        'support_levels': result['support_levels'],
+        'resistance_levels': result['resistance_levels'],
+        'last_price': result['last_price']
+    }
+    with _INDICATOR_CACHE_LOCK:
+        if len(_INDICATOR_CACHE) >= INDICATOR_CACHE_SIZE:
+            # Dicts keep insertion order, so this evicts the oldest entry
+            _INDICATOR_CACHE.pop(next(iter(_INDICATOR_CACHE)), None)
+        _INDICATOR_CACHE[key] = cached
+    
+    return result
+
+def _indicator_pool():
+    """
+    Return the shared indicator thread pool, creating it on first use.
+    """
+    global _INDICATOR_POOL
+    with _INDICATOR_POOL_LOCK:
+        if _INDICATOR_POOL is None:
+            _INDICATOR_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="indicators")
+        return _INDICATOR_POOL
+
+def _compute_all_indicators(data):
+    """
+    Calculate all technical indicators without consulting the cache.
+    
+    The indicators are independent of each other, so on long frames they are
+    computed concurrently and assigned to `data` once all have finished.
+    
+    Args:
+        data (pandas.DataFrame): DataFrame with price data
+    
+    Returns:
+        dict: Dictionary containing all calculated indicators
+    """
+    if len(data) >= PARALLEL_MIN_ROWS:
+        pool = _indicator_pool()
+        futures = [pool.submit(func, data) for func in
+                   (calculate_rsi, calculate_macd, calculate_bollinger_bands, find_support_resistance)]
+        rsi, macd, bollinger, levels = [future.result() for future in futures]
+    else:
+        rsi = calculate_rsi(data)
+        macd = calculate_macd(data)
+        bollinger = calculate_bollinger_bands(data)
+        levels = find_support_resistance(data)
+    
     # Calculate RSI
-    data['rsi'] = calculate_rsi(data)
+    data['rsi'] = rsi
     
     # Calculate MACD
-    macd_line, signal_line, histogram = calculate_macd(data)
+    macd_line, signal_line, histogram = macd
     data['macd'] = macd_line
     data['macd_signal'] = signal_line
     data['macd_histogram'] = histogram
     
     # Calculate Bollinger Bands
-    upper_band, middle_band, lower_band = calculate_bollinger_bands(data)
+    upper_band, middle_band, lower_band = bollinger
     data['bb_upper'] = upper_band
     data['bb_middle'] = middle_band
     data['bb_lower'] = lower_band
     
     # Find support and resistance levels
-    support_levels, resistance_levels = find_support_resistance(data)
+    support_levels, resistance_levels = levels
     
     return {
         'data': data,
@@ -140,3 +337,40 @@ def calculate_all_indicators(data):
         'resistance_levels': resistance_levels,
         'last_price': data['close'].iloc[-1] if not data.empty else None
     }
+
+def calculate_latest_indicators(data, tail=LATEST_TAIL):
+    """
+    Calculate only the latest value of each indicator.
+    
+    Works on the last `tail` bars and leaves `data` untouched, for callers such
+    as signal generation that read the most recent reading rather than the
+    full indicator columns charts need. Support and resistance levels are
+    taken from the same window.
+    
+    Args:
+        data (pandas.DataFrame): DataFrame with price data
+        tail (int): Number of most recent bars to compute on
+    
+    Returns:
+        dict: Latest indicator values, support and resistance levels and last price
+    """
+    if data.empty:
+        return {}
+    
+    recent = data.iloc[-tail:]
+    macd_line, signal_line, histogram = calculate_macd(recent)
+    upper_band, middle_band, lower_band = calculate_bollinger_bands(recent)
+    support_levels, resistance_levels = find_support_resistance(recent)
+    
+    return {
+        'rsi': float(calculate_rsi(recent).iloc[-1]),
+        'macd': float(macd_line.iloc[-1]),
+        'macd_signal': float(signal_line.iloc[-1]),
+        'macd_histogram': float(histogram.iloc[-1]),
+        'bb_upper': float(upper_band.iloc[-1]),
+        'bb_middle': float(middle_band.iloc[-1]),
+        'bb_lower': float(lower_band.iloc[-1]),
+        'support_levels': support_levels,
+        'resistance_levels': resistance_levels,
+        'last_price': recent['close'].iloc[-1]
+    }